@@ -0,0 +1,165 @@
+"""
+性能基准
+========================
+对比项目文件夹生成的几种方式：
+
+- dict：create_folders_recursive（仅 subfolder_config 目录）
+- zip / tar：validate_archive + materialize_archive（目录 + 参考文件，tar 冷 / 热索引缓存）
+- 模拟网络文件系统（1 / 10 / 50 ms 往返延迟，±20% 波动）下串行、固定并发与自适应并发的吞吐量
+
+运行：python benchmarks.py
+"""
+
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from statistics import median
+
+from project_template_builder import (
+    AdaptiveConcurrency,
+    SimulatedSlowFileSystem,
+    create_folders_parallel,
+    create_folders_recursive,
+    materialize_archive,
+    read_archive_index,
+    validate_archive,
+)
+
+
+def build_folder_dict(width, depth):
+    """生成测试用的文件夹字典（每层 width 个子文件夹，共 depth 层）"""
+    if depth == 0:
+        return {}
+    return {f"DIR_{i}": build_folder_dict(width, depth - 1) for i in range(width)}
+
+
+def write_archives(folder_dict, work_dir, file_size=1024):
+    """将文件夹字典写成 zip 和 tar 归档（每个目录放一个文件），返回两者路径"""
+    source = os.path.join(work_dir, "source")
+    create_folders_recursive(source, folder_dict)
+    payload = os.urandom(file_size)
+    for dirpath, _, _ in os.walk(source):
+        with open(os.path.join(dirpath, "README.txt"), "wb") as f:
+            f.write(payload)
+
+    zip_path = os.path.join(work_dir, "template.zip")
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for dirpath, dirnames, filenames in os.walk(source):
+            for name in dirnames + filenames:
+                path = os.path.join(dirpath, name)
+                zf.write(path, os.path.relpath(path, source))
+
+    tar_path = os.path.join(work_dir, "template.tar.gz")
+    with tarfile.open(tar_path, "w:gz") as tf:
+        for name in os.listdir(source):
+            tf.add(os.path.join(source, name), arcname=name)
+
+    return zip_path, tar_path
+
+
+def measure(label, func, work_dir, repeat, reset=None):
+    """重复执行 func(目标目录) 并打印中位耗时"""
+    timings = []
+    for i in range(repeat):
+        if reset:
+            reset()
+        target = os.path.join(work_dir, f"{label}_{i}")
+        os.makedirs(target)
+        start = time.perf_counter()
+        func(target)
+        timings.append(time.perf_counter() - start)
+        shutil.rmtree(target)
+    print(f"  {label:<18} {median(timings) * 1000:8.2f} ms")
+
+
+def bench_archive_materialization(width=8, depth=3, repeat=5):
+    """对比 dict 与归档两种生成方式"""
+    folder_dict = build_folder_dict(width, depth)
+    with tempfile.TemporaryDirectory() as work_dir:
+        zip_path, tar_path = write_archives(folder_dict, work_dir)
+        cache_path = os.path.join(work_dir, "archive_index_cache.json")
+
+        def clear_cache():
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+
+        print(f"[archive] width={width} depth={depth}, median of {repeat}")
+        measure("dict", lambda t: create_folders_recursive(t, folder_dict),
+                work_dir, repeat)
+
+        def from_archive(path):
+            # 与程序中一致：先校验索引，再流式写入
+            def run(target):
+                validate_archive(path, cache_path=cache_path)
+                materialize_archive(path, target)
+            return run
+
+        # zip 的索引来自中央目录，不走缓存
+        measure("zip", from_archive(zip_path), work_dir, repeat)
+        measure("tar.gz (cold)", from_archive(tar_path), work_dir, repeat, reset=clear_cache)
+        measure("tar.gz (cached)", from_archive(tar_path), work_dir, repeat)
+
+        # 单独统计索引读取，写文件的耗时波动不会掩盖缓存节省的扫描
+        def read_index(target):
+            read_archive_index(tar_path, cache_path)
+
+        measure("tar index (cold)", read_index, work_dir, repeat, reset=clear_cache)
+        measure("tar index (cached)", read_index, work_dir, repeat)
+
+
+def count_folders(folder_dict):
+    """统计文件夹字典中的文件夹总数"""
+    return sum(1 + count_folders(children) for children in folder_dict.values())
+
+
+def bench_slow_filesystem(width=8, depth=2, capacity=16, jitter=0.2,
+                          rtts=(0.001, 0.01, 0.05)):
+    """模拟网络延迟（带随机波动）下对比串行、固定并发和自适应并发"""
+    folder_dict = build_folder_dict(width, depth)
+    total = count_folders(folder_dict)
+    print(f"[slow fs] {total} folders, server capacity={capacity}, jitter=±{jitter:.0%}")
+
+    for rtt in rtts:
+        print(f"  rtt={rtt * 1000:.0f} ms")
+        runs = (
+            ("serial", lambda fs, t: create_folders_recursive(t, folder_dict, fs), None),
+            ("fixed x4", None, lambda: AdaptiveConcurrency(initial=4, min_workers=4, max_workers=4)),
+            ("adaptive", None, AdaptiveConcurrency),
+        )
+        for label, func, make_controller in runs:
+            with tempfile.TemporaryDirectory() as work_dir:
+                fs = SimulatedSlowFileSystem(latency=rtt, jitter=jitter,
+                                             capacity=capacity, seed=0)
+                controller = make_controller() if make_controller else None
+                start = time.perf_counter()
+                if func:
+                    func(fs, work_dir)
+                else:
+                    create_folders_parallel(work_dir, folder_dict, fs, controller)
+                elapsed = time.perf_counter() - start
+            workers = f"  (final workers={controller.workers})" if controller else ""
+            print(f"    {label:<10} {total / elapsed:9.1f} folders/s{workers}")
+
+    # 注入 5% 失败率，验证重试与降并发（重试耗尽时会抛出 OSError）
+    with tempfile.TemporaryDirectory() as work_dir:
+        fs = SimulatedSlowFileSystem(latency=0.01, jitter=jitter, failure_rate=0.05,
+                                     capacity=capacity, seed=0)
+        controller = AdaptiveConcurrency()
+        start = time.perf_counter()
+        try:
+            create_folders_parallel(work_dir, folder_dict, fs, controller)
+            result = "ok"
+        except OSError as e:
+            result = f"gave up ({e})"
+        elapsed = time.perf_counter() - start
+    print(f"  rtt=10 ms, 5% failures: {result}, {fs.calls} calls, "
+          f"{fs.failures} injected failures, {elapsed * 1000:.0f} ms "
+          f"(final workers={controller.workers})")
+
+
+if __name__ == "__main__":
+    bench_archive_materialization()
+    bench_slow_filesystem()
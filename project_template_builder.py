@@ -12,11 +12,23 @@
 """
 
 import os
+import re
 import sys
 import json
+import time
+import errno
+import random
+import shutil
+import tarfile
+import zipfile
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager
 from datetime import datetime
+from statistics import median
 import customtkinter as ctk
-from tkinter import filedialog, messagebox
+from tkinter import Listbox, filedialog, messagebox
 
 
 # ============================================================
@@ -91,10 +103,700 @@ def save_config(config):
         json.dump(config, f, indent=4, ensure_ascii=False)
 
 
+def rename_config_types(config, renames):
+    """在配置中同时重命名多个类型 {原名称: 新名称}（支持互换，保持原有顺序），成功返回 True"""
+    subfolder_config = config["subfolder_config"]
+    targets = set(renames.values())
+    if any(old not in subfolder_config for old in renames) or len(targets) != len(renames):
+        return False
+    if any(new in subfolder_config and new not in renames for new in targets):
+        return False
+    
+    config["subfolder_config"] = {
+        renames.get(name, name): folders for name, folders in subfolder_config.items()
+    }
+    if "template_archives" in config:
+        config["template_archives"] = {
+            renames.get(name, name): path for name, path in config["template_archives"].items()
+        }
+    return True
+
+
 # 全局配置
 CONFIG = load_config()
 
 
+# ============================================================
+# 文件系统后端
+# ============================================================
+
+class LocalFileSystem:
+    """本地文件系统后端（文件夹生成的所有磁盘操作都经过这里）"""
+    
+    def makedirs(self, path):
+        """创建文件夹（已存在时忽略）"""
+        os.makedirs(path, exist_ok=True)
+    
+    def open_write(self, path):
+        """以二进制写模式打开文件"""
+        return open(path, "wb")
+
+
+class SimulatedSlowFileSystem(LocalFileSystem):
+    """模拟 SMB/NFS 等网络文件系统：在本地操作前注入延迟和随机失败
+    
+    - latency：每次调用的往返延迟（秒）
+    - jitter：延迟的随机波动比例（0.2 表示 ±20%）
+    - failure_rate：调用失败（抛出 OSError）的概率
+    - capacity：服务端可同时处理的请求数，超出部分排队（None 表示不限）
+    
+    calls / failures 统计调用次数和注入的失败次数。
+    """
+    
+    def __init__(self, latency=0.01, jitter=0.0, failure_rate=0.0, capacity=None,
+                 seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(capacity) if capacity else None
+        self.calls = 0
+        self.failures = 0
+    
+    def _round_trip(self, path):
+        """模拟一次网络往返"""
+        with self._lock:
+            delay = self.latency * (1 + self._random.uniform(-self.jitter, self.jitter))
+        if self._slots:
+            with self._slots:
+                time.sleep(delay)
+        else:
+            time.sleep(delay)
+        with self._lock:
+            failed = self._random.random() < self.failure_rate
+            self.calls += 1
+            self.failures += failed
+        if failed:
+            raise OSError(errno.EIO, "模拟 I/O 失败", path)
+    
+    def makedirs(self, path):
+        self._round_trip(path)
+        super().makedirs(path)
+    
+    def open_write(self, path):
+        self._round_trip(path)
+        return super().open_write(path)
+
+
+class AdaptiveConcurrency:
+    """根据观察到的 mkdir 延迟自适应调整并发数（AIMD）
+    
+    每收集 window 个样本，用中位延迟与基准比较：未超过基准的 tolerance 倍
+    （或低于 floor，本地磁盘的微秒级延迟不做调整）则并发 +1，超过或调用失败则并发减半。
+    基准取每个窗口的低分位延迟，并按 smoothing 做指数平滑，
+    偶尔一次特别快的调用不会把基准永久压低。
+    """
+    
+    def __init__(self, initial=4, min_workers=1, max_workers=32,
+                 tolerance=2.0, window=8, smoothing=0.2, floor=0.001):
+        self.workers = initial
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.tolerance = tolerance
+        self.window = window
+        self.smoothing = smoothing
+        self.floor = floor
+        self.baseline = None
+        self._samples = []
+    
+    def record(self, latency):
+        """记录一次成功调用的延迟（秒）"""
+        self._samples.append(latency)
+        if len(self._samples) < self.window:
+            return
+        
+        samples = sorted(self._samples)
+        self._samples.clear()
+        typical = median(samples)
+        low = samples[len(samples) // 4]
+        
+        # 先与当前基准比较，再更新基准
+        if self.baseline is None:
+            self.baseline = low
+        if typical > max(self.baseline * self.tolerance, self.floor):
+            self.workers = max(self.min_workers, self.workers // 2)
+        else:
+            self.workers = min(self.max_workers, self.workers + 1)
+        self.baseline += self.smoothing * (low - self.baseline)
+    
+    def record_failure(self):
+        """记录一次失败调用"""
+        self._samples.clear()
+        self.workers = max(self.min_workers, self.workers // 2)
+
+
+# ============================================================
+# 项目文件夹生成
+# ============================================================
+
+def create_folders_recursive(base_path, folder_dict, fs=None):
+    """递归创建文件夹结构"""
+    fs = fs or LocalFileSystem()
+    for name, children in folder_dict.items():
+        folder_path = os.path.join(base_path, name)
+        fs.makedirs(folder_path)
+        if children:
+            create_folders_recursive(folder_path, children, fs)
+
+
+def collect_folder_paths(folder_dict, prefix=()):
+    """递归收集所有子文件夹的相对路径 [(一级, 二级, ...), ...]"""
+    paths = []
+    for name, children in folder_dict.items():
+        path = prefix + (name,)
+        paths.append(path)
+        paths.extend(collect_folder_paths(children, path))
+    return paths
+
+
+def _timed_makedirs(fs, path):
+    """创建文件夹并返回耗时（秒）"""
+    start = time.perf_counter()
+    fs.makedirs(path)
+    return time.perf_counter() - start
+
+
+# 可重试的临时性错误（网络抖动、服务端繁忙），其余错误（权限、磁盘满等）直接抛出
+TRANSIENT_ERRNOS = {
+    errno.EIO, errno.EAGAIN, errno.EBUSY, errno.EINTR,
+    errno.ETIMEDOUT, errno.ECONNRESET, errno.ECONNABORTED,
+}
+
+
+def create_folders_parallel(base_path, folder_dict, fs=None, controller=None,
+                            max_retries=2):
+    """并行创建文件夹结构，返回创建的文件夹数
+    
+    父文件夹创建完成后立即提交其子文件夹；同时进行的请求数由
+    controller（AdaptiveConcurrency）根据延迟动态调整。
+    临时性错误（TRANSIENT_ERRNOS）最多重试 max_retries 次，其余 OSError 直接抛出。
+    """
+    fs = fs or LocalFileSystem()
+    controller = controller or AdaptiveConcurrency()
+    pending = deque((os.path.join(base_path, name), children, 0)
+                    for name, children in folder_dict.items())
+    in_flight = {}
+    created = 0
+    
+    with ThreadPoolExecutor(max_workers=controller.max_workers) as executor:
+        while pending or in_flight:
+            while pending and len(in_flight) < controller.workers:
+                item = pending.popleft()
+                in_flight[executor.submit(_timed_makedirs, fs, item[0])] = item
+            
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                folder_path, children, attempt = in_flight.pop(future)
+                try:
+                    latency = future.result()
+                except OSError as e:
+                    if e.errno not in TRANSIENT_ERRNOS or attempt >= max_retries:
+                        raise
+                    controller.record_failure()
+                    pending.append((folder_path, children, attempt + 1))
+                    continue
+                
+                controller.record(latency)
+                created += 1
+                pending.extend((os.path.join(folder_path, name), grandchildren, 0)
+                               for name, grandchildren in children.items())
+    
+    return created
+
+
+def get_archive_cache_path():
+    """获取模板归档索引缓存路径"""
+    return os.path.join(get_app_dir(), "archive_index_cache.json")
+
+
+def resolve_archive_path(path):
+    """解析模板归档路径（相对路径以程序目录为基准）"""
+    if os.path.isabs(path):
+        return path
+    return os.path.join(get_app_dir(), path)
+
+
+def archive_member_parts(name):
+    """拆分归档条目路径，不安全的路径返回 None
+    
+    拒绝绝对路径、..，以及任何含 ":" 的部分（Windows 盘符、备用数据流）。
+    """
+    name = name.replace("\\", "/")
+    if name.startswith("/"):
+        return None
+    parts = [part for part in name.split("/") if part not in ("", ".")]
+    if not parts or any(part == ".." or ":" in part for part in parts):
+        return None
+    return parts
+
+
+def archive_member_path(target_dir, name):
+    """归档条目在项目文件夹中的目标路径，不安全或超出 target_dir 时返回 None"""
+    parts = archive_member_parts(name)
+    if parts is None:
+        return None
+    path = os.path.abspath(os.path.join(target_dir, *parts))
+    root = os.path.abspath(target_dir)
+    if os.path.commonpath([root, path]) != root or path == root:
+        return None
+    return path
+
+
+def iter_archive_entries(archive_path):
+    """逐条读取归档，产出 (名称, 是否目录, 文件对象)
+    
+    zip 按中央目录逐条打开；tar 以流模式（r|*）顺序读取，不解压到临时目录。
+    符号链接、设备文件等特殊条目会被跳过。
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    yield info.filename, True, None
+                else:
+                    with zf.open(info) as fileobj:
+                        yield info.filename, False, fileobj
+    else:
+        with tarfile.open(archive_path, "r|*") as tf:
+            for member in tf:
+                if member.isdir():
+                    yield member.name, True, None
+                elif member.isfile():
+                    yield member.name, False, tf.extractfile(member)
+
+
+def scan_archive(archive_path):
+    """扫描 tar 归档生成条目索引 [[名称, 是否目录], ...]（需要完整读一遍归档）"""
+    entries = []
+    with tarfile.open(archive_path, "r|*") as tf:
+        for member in tf:
+            if member.isdir() or member.isfile():
+                entries.append([member.name, member.isdir()])
+    return entries
+
+
+def read_archive_index(archive_path, cache_path=None):
+    """读取归档条目索引 [[名称, 是否目录], ...]
+    
+    zip 直接读中央目录；tar 没有目录表，扫描一遍要解压整个归档，
+    因此按 (路径, 修改时间, 大小) 缓存到磁盘，并清理已失效的条目。
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            return [[info.filename, info.is_dir()] for info in zf.infolist()]
+    
+    cache_path = cache_path or get_archive_cache_path()
+    key = os.path.abspath(archive_path)
+    stat = os.stat(archive_path)
+    
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+    
+    cached = cache.get(key)
+    if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+        return cached["entries"]
+    
+    entries = scan_archive(archive_path)
+    cache = {path: item for path, item in cache.items() if os.path.exists(path)}
+    cache[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "entries": entries}
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+    except OSError:
+        # 缓存写入失败不影响创建
+        pass
+    return entries
+
+
+def validate_archive(archive_path, folder_dict=None, cache_path=None):
+    """创建项目前校验归档，有问题时抛出 ValueError
+    
+    检查不安全的路径，以及归档文件与文件夹同名（包括 subfolder_config 子文件夹、
+    归档中的目录和其他条目的上级目录，如同时包含文件 REF 和 REF/a.txt）。
+    """
+    folders = {os.path.normcase(os.path.join(*path))
+               for path in collect_folder_paths(folder_dict or {})}
+    files = []
+    for name, is_dir in read_archive_index(archive_path, cache_path):
+        parts = archive_member_parts(name)
+        if parts is None:
+            raise ValueError(f"归档包含不安全的路径：{name}")
+        
+        # 每个条目的上级路径都必须是文件夹
+        for depth in range(1, len(parts)):
+            folders.add(os.path.normcase(os.path.join(*parts[:depth])))
+        path = os.path.normcase(os.path.join(*parts))
+        if is_dir:
+            folders.add(path)
+        else:
+            files.append((name, path))
+    
+    for name, path in files:
+        if path in folders:
+            raise ValueError(f"归档文件与文件夹同名：{name}")
+
+
+def materialize_archive(archive_path, target_dir, fs=None):
+    """将模板归档逐条流式写入项目文件夹，返回写入的文件数
+    
+    每个条目写入前都会检查目标路径仍在 target_dir 内；
+    调用前应先用 validate_archive 校验，避免中途失败。
+    """
+    fs = fs or LocalFileSystem()
+    created = set()
+    count = 0
+    
+    for name, is_dir, fileobj in iter_archive_entries(archive_path):
+        path = archive_member_path(target_dir, name)
+        if path is None:
+            raise ValueError(f"归档包含不安全的路径：{name}")
+        
+        # 每个目录只创建一次（网络路径上每次调用都是一次往返）
+        folder = path if is_dir else os.path.dirname(path)
+        if folder not in created:
+            fs.makedirs(folder)
+            created.add(folder)
+        
+        if not is_dir:
+            with fs.open_write(path) as f:
+                shutil.copyfileobj(fileobj, f)
+            count += 1
+    
+    return count
+
+
+# ============================================================
+# 项目文件夹批量重命名
+# ============================================================
+
+# 项目文件夹名称：YYYYMMDD_TYPE_DETAIL
+PROJECT_FOLDER_PATTERN = re.compile(r"^(\d{8})_(.+)$")
+
+
+def get_journal_path():
+    """获取批量重命名日志路径（用于撤销）"""
+    return os.path.join(get_app_dir(), "rename_journal.json")
+
+
+def get_project_roots(config):
+    """获取需要扫描的项目根目录（未配置 project_roots 时使用默认路径）"""
+    roots = config.get("project_roots") or [config.get("default_path", "")]
+    return [root for root in roots if root and os.path.isdir(root)]
+
+
+def index_project_folders(roots, project_types):
+    """单次扫描根目录，按类型建立项目文件夹索引 {类型: [文件夹路径, ...]}"""
+    # 长名称优先匹配，避免 "ART" 抢走 "ART_3D" 的文件夹
+    types = sorted(set(project_types), key=len, reverse=True)
+    index = {type_name: [] for type_name in types}
+    
+    for root in roots:
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    match = PROJECT_FOLDER_PATTERN.match(entry.name)
+                    if not match or not entry.is_dir(follow_symlinks=False):
+                        continue
+                    rest = match.group(2)
+                    for type_name in types:
+                        if rest.startswith(type_name + "_"):
+                            index[type_name].append(entry.path)
+                            break
+        except OSError:
+            # 根目录不可访问时跳过
+            continue
+    
+    return index
+
+
+def plan_bulk_rename(roots, renames, project_types):
+    """生成批量重命名计划（预览，不修改磁盘）
+    
+    renames 为 {原类型: 新类型}，所有类型基于同一次扫描生成计划，支持互换和循环。
+    返回 (plan, conflicts)，均为 [(原路径, 新路径), ...]；
+    conflicts 为目标已存在（且不会被本批重命名腾出）、需要跳过的项。
+    """
+    index = index_project_folders(roots, set(project_types) | set(renames))
+    moves = []
+    for old_type, new_type in renames.items():
+        for src in index.get(old_type, []):
+            parent, name = os.path.split(src)
+            date_str, rest = name.split("_", 1)
+            detail = rest[len(old_type) + 1:]
+            moves.append((src, os.path.join(parent, f"{date_str}_{new_type}_{detail}")))
+    
+    # 目标已存在时，只有它本身也在本批中移走才可以使用；跳过的项又会占住自己的位置
+    plan = moves
+    conflicts = []
+    while True:
+        sources = {os.path.normcase(src) for src, _ in plan}
+        blocked = [(src, dst) for src, dst in plan
+                   if os.path.exists(dst) and os.path.normcase(dst) not in sources]
+        if not blocked:
+            return plan, conflicts
+        conflicts.extend(blocked)
+        plan = [move for move in plan if move not in blocked]
+
+
+def rename_in_parallel(pairs, progress_callback=None, max_workers=8):
+    """并行执行 os.rename，返回 (成功列表, 失败列表)
+    
+    progress_callback(已完成数, 总数) 在调用线程中执行，可直接刷新界面。
+    """
+    done = []
+    failed = []
+    total = len(pairs)
+    if not total:
+        return done, failed
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(os.rename, src, dst): (src, dst)
+                   for src, dst in pairs}
+        for count, future in enumerate(as_completed(futures), 1):
+            pair = futures[future]
+            try:
+                future.result()
+                done.append(pair)
+            except OSError as e:
+                failed.append((pair, str(e)))
+            if progress_callback:
+                progress_callback(count, total)
+    
+    return done, failed
+
+
+def resolve_rename_order(pairs):
+    """为每项改名安排临时名称，返回 [(原路径, 目标路径, 临时路径或 None), ...]
+    
+    目标仍被本批其他项占用（互换、循环）时，需先改为临时名称。
+    """
+    sources = {os.path.normcase(src) for src, _ in pairs}
+    return [(src, dst, f"{src}.gecko-renaming" if os.path.normcase(dst) in sources else None)
+            for src, dst in pairs]
+
+
+def rename_two_phase(pairs, progress_callback=None, on_stage=None):
+    """分两阶段并行改名，支持互换和循环，返回 (成功列表, 失败列表)
+    
+    第一阶段：直接改名，或先改为临时名称；第二阶段：临时名称 -> 目标。
+    on_stage(阶段, steps) 在 "moving" / "staged" / "done" 时调用，用于写日志。
+    """
+    steps = resolve_rename_order(pairs)
+    total = len(steps) + sum(1 for _, _, tmp in steps if tmp)
+    
+    def report(offset):
+        if progress_callback:
+            return lambda count, _: progress_callback(offset + count, total)
+        return None
+    
+    if on_stage:
+        on_stage("moving", steps)
+    moved, failed = rename_in_parallel([(src, tmp or dst) for src, dst, tmp in steps],
+                                       report(0))
+    
+    # 第一阶段失败的项仍在原位，不再参与后续步骤
+    moved_sources = {src for src, _ in moved}
+    steps = [step for step in steps if step[0] in moved_sources]
+    if on_stage:
+        on_stage("staged", steps)
+    staged = [(tmp, dst) for _, dst, tmp in steps if tmp]
+    _, staged_failed = rename_in_parallel(staged, report(len(pairs)))
+    
+    stuck = {tmp for (tmp, _), _ in staged_failed}
+    source_of = {tmp: src for src, _, tmp in steps if tmp}
+    done = [(src, dst) for src, dst, tmp in steps if tmp not in stuck]
+    failed += [((source_of[tmp], dst), error) for (tmp, dst), error in staged_failed]
+    if on_stage:
+        on_stage("done", steps)
+    return done, failed
+
+
+def save_rename_journal(renames, steps, stage):
+    """写入批量重命名日志（一次保存对应一条日志，撤销时整批回滚）"""
+    journal = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "types": [[old, new] for old, new in renames.items()],
+        "stage": stage,
+        "renames": [list(step) for step in steps],
+    }
+    with open(get_journal_path(), "w", encoding="utf-8") as f:
+        json.dump(journal, f, indent=4, ensure_ascii=False)
+
+
+def load_rename_journal():
+    """读取批量重命名日志，不存在时返回 None"""
+    try:
+        with open(get_journal_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def execute_bulk_rename(plan, renames, progress_callback=None):
+    """执行重命名计划，每个阶段开始前更新日志（中途中断也可撤销）"""
+    return rename_two_phase(
+        plan, progress_callback,
+        on_stage=lambda stage, steps: save_rename_journal(renames, steps, stage)
+    )
+
+
+def journal_locations(journal):
+    """根据日志找出已改名文件夹的当前位置，返回 [(当前位置, 原路径), ...]"""
+    pairs = []
+    for src, dst, tmp in journal["renames"]:
+        if tmp and os.path.exists(tmp):
+            pairs.append((tmp, src))
+        elif tmp and journal["stage"] == "moving":
+            # 第一阶段未完成：目标仍是本批另一项的原文件夹
+            continue
+        elif os.path.exists(dst):
+            pairs.append((dst, src))
+    return pairs
+
+
+def undo_bulk_rename(progress_callback=None):
+    """按日志撤销上一次保存的整批重命名，返回 (成功列表, 失败列表)
+    
+    文件夹全部改回后，config.json 中的类型名称和使用统计也一并改回。
+    """
+    journal = load_rename_journal()
+    if not journal:
+        return [], []
+    
+    done, failed = rename_two_phase(journal_locations(journal), progress_callback)
+    
+    if not failed:
+        restore = {new: old for old, new in journal["types"]}
+        config = load_config()
+        if rename_config_types(config, restore):
+            save_config(config)
+            rename_types_usage(restore)
+        os.remove(get_journal_path())
+    return done, failed
+
+
+# ============================================================
+# 类型搜索
+# ============================================================
+
+# 每次使用类型时，已有计数按此比例衰减（近期使用权重更高）
+USAGE_DECAY = 0.95
+
+
+def get_usage_stats_path():
+    """获取类型使用统计路径（与 config.json 同目录）"""
+    return os.path.join(get_app_dir(), "usage_stats.json")
+
+
+def load_usage_stats():
+    """加载类型使用统计 {类型: 衰减后的使用次数}"""
+    try:
+        with open(get_usage_stats_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_usage_stats(stats):
+    """保存类型使用统计（写入失败不影响创建）"""
+    try:
+        with open(get_usage_stats_path(), "w", encoding="utf-8") as f:
+            json.dump(stats, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def record_type_usage(project_type):
+    """记录一次类型使用"""
+    stats = load_usage_stats()
+    stats = {name: round(count * USAGE_DECAY, 4) for name, count in stats.items()}
+    stats[project_type] = stats.get(project_type, 0) + 1
+    save_usage_stats(stats)
+
+
+def rename_types_usage(renames):
+    """类型重命名后沿用原有使用统计 {原名称: 新名称}（支持互换）"""
+    stats = load_usage_stats()
+    renamed = {}
+    for name, count in stats.items():
+        new_name = renames.get(name, name)
+        renamed[new_name] = renamed.get(new_name, 0) + count
+    if renamed != stats:
+        save_usage_stats(renamed)
+
+
+def collect_folder_names(folder_dict):
+    """递归收集所有子文件夹名称"""
+    names = []
+    for name, children in folder_dict.items():
+        names.append(name)
+        names.extend(collect_folder_names(children))
+    return names
+
+
+def is_subsequence(query, text):
+    """query 的字符是否按顺序出现在 text 中"""
+    chars = iter(text)
+    return all(char in chars for char in query)
+
+
+class TypeSearchIndex:
+    """类型搜索索引
+    
+    匹配优先级：完全匹配 > 前缀 > 子串 > 子序列 > 子文件夹名称，
+    同一优先级内按使用频率排序，再按配置中的顺序。
+    """
+    
+    def __init__(self, subfolder_config, usage=None, include_subfolders=True):
+        self.usage = usage or {}
+        # 预先计算小写名称和子文件夹文本，每次按键只做字符串比较
+        self.entries = []
+        for order, (name, folders) in enumerate(subfolder_config.items()):
+            folder_text = ""
+            if include_subfolders:
+                folder_text = "\n".join(collect_folder_names(folders)).lower()
+            self.entries.append((order, name, name.lower(), folder_text))
+    
+    def match_rank(self, query, key, folder_text):
+        """返回匹配优先级（越小越好），不匹配时返回 None"""
+        if key == query:
+            return 0
+        if key.startswith(query):
+            return 1
+        if query in key:
+            return 2
+        if is_subsequence(query, key):
+            return 3
+        if query in folder_text:
+            return 4
+        return None
+    
+    def search(self, query, limit=None):
+        """搜索类型，返回排序后的类型名称列表（limit 为 None 时返回全部匹配）"""
+        query = query.strip().lower()
+        ranked = []
+        for order, name, key, folder_text in self.entries:
+            rank = self.match_rank(query, key, folder_text) if query else 0
+            if rank is not None:
+                ranked.append((rank, -self.usage.get(name, 0), order, name))
+        ranked.sort()
+        return [name for _, _, _, name in ranked[:limit]]
+
+
 # ============================================================
 # 模板管理窗口
 # ============================================================
@@ -110,6 +812,7 @@ class TemplateManagerWindow(ctk.CTkToplevel):
         self.config = load_config()  # 重新加载最新配置
         self.current_type = None
         self.last_enter_time = 0  # 用于检测双击回车
+        self.pending_renames = {}  # 未保存的类型重命名 {原名称: 新名称}
         
         # 窗口设置
         self.title("⚙️ 模板管理")
@@ -211,6 +914,13 @@ class TemplateManagerWindow(ctk.CTkToplevel):
                                    command=self.rename_type, height=28)
         rename_btn.pack(side="left", padx=(10, 0))
         
+        undo_rename_btn = ctk.CTkButton(name_frame, text="↩️ 撤销", width=70,
+                                        command=self.undo_last_bulk_rename, height=28,
+                                        fg_color="transparent", border_width=1,
+                                        text_color=("gray10", "gray90"),
+                                        hover_color=("gray70", "gray30"))
+        undo_rename_btn.pack(side="left", padx=(6, 0))
+        
         # 子文件夹编辑区标题
         subfolder_title = ctk.CTkLabel(right_frame, 
                                        text="📁 子文件夹结构（支持三级）",
@@ -390,6 +1100,9 @@ class TemplateManagerWindow(ctk.CTkToplevel):
         
         if messagebox.askyesno("确认删除", f"确定删除类型 '{self.current_type}'？"):
             del self.config["subfolder_config"][self.current_type]
+            self.config.get("template_archives", {}).pop(self.current_type, None)
+            self.pending_renames = {old: new for old, new in self.pending_renames.items()
+                                    if new != self.current_type}
             self.current_type = None
             self.refresh_type_list()
             
@@ -415,15 +1128,128 @@ class TemplateManagerWindow(ctk.CTkToplevel):
             messagebox.showwarning("提示", f"类型 '{new_name}' 已存在！")
             return
         
-        # 重命名
-        old_data = self.config["subfolder_config"][self.current_type]
-        del self.config["subfolder_config"][self.current_type]
-        self.config["subfolder_config"][new_name] = old_data
+        # 重命名（先保存当前编辑，避免 select_type 写回旧名称）
+        self.save_current_type()
+        old_name = self.current_type
+        rename_config_types(self.config, {old_name: new_name})
+        
+        # 记录待保存的重命名，连续重命名合并为 原名称 -> 最新名称
+        original = next((old for old, new in self.pending_renames.items()
+                         if new == old_name), old_name)
+        if original == new_name:
+            self.pending_renames.pop(original, None)
+        else:
+            self.pending_renames[original] = new_name
         
-        self.current_type = new_name
+        self.current_type = None
         self.refresh_type_list()
         self.select_type(new_name)
     
+    def offer_bulk_rename(self, renames):
+        """预览并批量重命名已有项目文件夹（YYYYMMDD_OLD_DETAIL -> YYYYMMDD_NEW_DETAIL）
+        
+        renames 为本次保存的全部类型重命名 {原名称: 新名称}。
+        在配置保存后调用，磁盘与 config.json 保持一致。
+        """
+        # 磁盘上的文件夹仍是重命名前的类型
+        restore = {new: old for old, new in renames.items()}
+        disk_types = [restore.get(name, name) for name in self.config["subfolder_config"]]
+        plan, conflicts = plan_bulk_rename(get_project_roots(self.config), renames, disk_types)
+        if not plan:
+            return
+        
+        # 预览（最多显示 10 项）
+        types = "、".join(f"'{old}' → '{new}'" for old, new in renames.items())
+        preview = "\n".join(
+            f"{os.path.basename(src)}  →  {os.path.basename(dst)}"
+            for src, dst in plan[:10]
+        )
+        if len(plan) > 10:
+            preview += f"\n... 共 {len(plan)} 个"
+        if conflicts:
+            preview += f"\n\n⚠️ {len(conflicts)} 个目标已存在，将跳过"
+        
+        if not messagebox.askyesno(
+            "批量重命名",
+            f"类型已重命名：{types}\n发现 {len(plan)} 个项目文件夹，是否同步重命名？\n\n{preview}",
+            parent=self
+        ):
+            return
+        
+        with self.progress_dialog("批量重命名") as progress:
+            done, failed = execute_bulk_rename(plan, renames, progress)
+        self.show_rename_result("批量重命名", done, failed)
+    
+    def undo_last_bulk_rename(self):
+        """撤销上一次保存的整批重命名"""
+        journal = load_rename_journal()
+        if not journal or not journal.get("renames"):
+            messagebox.showinfo("提示", "没有可撤销的批量重命名。", parent=self)
+            return
+        
+        restore = {new: old for old, new in journal["types"]}
+        types = "、".join(f"'{new}' → '{old}'" for new, old in restore.items())
+        if not messagebox.askyesno(
+            "撤销批量重命名",
+            f"将 {len(journal['renames'])} 个文件夹和类型名称改回：{types}？",
+            parent=self
+        ):
+            return
+        
+        with self.progress_dialog("撤销批量重命名") as progress:
+            done, failed = undo_bulk_rename(progress)
+        
+        if not failed:
+            # config.json 已改回，同步当前窗口中的配置
+            self.save_current_type()
+            if rename_config_types(self.config, restore):
+                current = restore.get(self.current_type, self.current_type)
+                self.current_type = None
+                self.refresh_type_list()
+                if current:
+                    self.select_type(current)
+            if self.on_save_callback:
+                self.on_save_callback()
+        self.show_rename_result("撤销批量重命名", done, failed)
+    
+    @contextmanager
+    def progress_dialog(self, title):
+        """显示进度窗口，返回 progress(已完成数, 总数) 回调"""
+        dialog = ctk.CTkToplevel(self)
+        dialog.title(title)
+        dialog.geometry("360x100")
+        dialog.resizable(False, False)
+        dialog.attributes("-topmost", True)
+        
+        label = ctk.CTkLabel(dialog, text="准备中...", font=ctk.CTkFont(size=13))
+        label.pack(pady=(18, 8))
+        bar = ctk.CTkProgressBar(dialog, width=300)
+        bar.set(0)
+        bar.pack()
+        dialog.update()
+        
+        def progress(count, total):
+            bar.set(count / total)
+            label.configure(text=f"{count} / {total}")
+            dialog.update()
+        
+        try:
+            yield progress
+        finally:
+            dialog.destroy()
+    
+    def show_rename_result(self, title, done, failed):
+        """显示批量重命名结果"""
+        message = f"成功：{len(done)} 个"
+        if failed:
+            details = "\n".join(
+                f"{os.path.basename(src)}：{error}" for (src, _), error in failed[:5]
+            )
+            message += f"\n失败：{len(failed)} 个\n\n{details}"
+            messagebox.showwarning(title, message, parent=self)
+        else:
+            messagebox.showinfo(title, message, parent=self)
+    
     def browse_default_path(self):
         """浏览默认路径"""
         folder = filedialog.askdirectory(
@@ -445,6 +1271,12 @@ class TemplateManagerWindow(ctk.CTkToplevel):
         # 写入文件
         save_config(self.config)
         
+        # 配置保存成功后，再同步磁盘上的项目文件夹和使用统计
+        if self.pending_renames:
+            rename_types_usage(self.pending_renames)
+            self.offer_bulk_rename(self.pending_renames)
+            self.pending_renames = {}
+        
         # 回调通知主窗口刷新
         if self.on_save_callback:
             self.on_save_callback()
@@ -468,7 +1300,7 @@ class ProjectTemplateBuilder(ctk.CTk):
         
         # 窗口基本设置
         self.title("📁 项目模板构建器")
-        self.geometry("500x360")
+        self.geometry("500x470")
         self.resizable(False, False)
         
         # 设置主题
@@ -493,13 +1325,15 @@ class ProjectTemplateBuilder(ctk.CTk):
         CONFIG = load_config()
         self.subfolder_config = CONFIG.get("subfolder_config", {})
         self.project_types = list(self.subfolder_config.keys())
+        self.type_index = TypeSearchIndex(self.subfolder_config, load_usage_stats())
+        self.template_archives = CONFIG.get("template_archives", {})
         self.default_path = CONFIG.get("default_path", r"D:\00working")
     
     def center_window(self):
         """将窗口居中显示"""
         self.update_idletasks()
         width = 500
-        height = 360
+        height = 470
         x = (self.winfo_screenwidth() // 2) - (width // 2)
         y = (self.winfo_screenheight() // 2) - (height // 2)
         self.geometry(f"{width}x{height}+{x}+{y}")
@@ -535,9 +1369,9 @@ class ProjectTemplateBuilder(ctk.CTk):
         )
         settings_btn.pack(side="right")
         
-        # ---- Type 下拉菜单 ----
+        # ---- Type 搜索 ----
         type_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
-        type_frame.pack(fill="x", pady=8)
+        type_frame.pack(fill="x", pady=(8, 4))
         
         type_label = ctk.CTkLabel(
             type_frame, 
@@ -548,17 +1382,47 @@ class ProjectTemplateBuilder(ctk.CTk):
         )
         type_label.pack(side="left")
         
-        self.type_var = ctk.StringVar(value=self.project_types[0] if self.project_types else "")
-        self.type_dropdown = ctk.CTkComboBox(
+        self.type_var = ctk.StringVar(value="")
+        self.type_search_entry = ctk.CTkEntry(
             type_frame,
-            values=self.project_types,
-            variable=self.type_var,
+            placeholder_text="搜索类型...（↑↓ 切换）",
             width=280,
+            font=ctk.CTkFont(size=13)
+        )
+        self.type_search_entry.pack(side="right", fill="x", expand=True)
+        self.type_search_entry.bind("<KeyRelease>", self.on_type_search)
+        self.type_search_entry.bind("<Down>", lambda e: self.move_type_selection(1))
+        self.type_search_entry.bind("<Up>", lambda e: self.move_type_selection(-1))
+        
+        # 搜索结果列表（Listbox 可容纳上百个类型，按键时整体替换内容，显示完整名称）
+        results_frame = ctk.CTkFrame(main_frame, fg_color="#343638")
+        results_frame.pack(fill="x", pady=(0, 4))
+        
+        self.type_results = []
+        self.type_selection = 0
+        self.last_type_query = None
+        self.type_results_list = Listbox(
+            results_frame,
+            height=5,
             font=ctk.CTkFont(size=13),
-            dropdown_font=ctk.CTkFont(size=13),
-            state="readonly"
+            bg="#343638",
+            fg="#dce4ee",
+            selectbackground="#2563eb",
+            selectforeground="white",
+            activestyle="none",
+            borderwidth=0,
+            highlightthickness=0,
+            exportselection=False
         )
-        self.type_dropdown.pack(side="right", fill="x", expand=True)
+        self.type_results_list.bind("<<ListboxSelect>>", self.on_type_result_click)
+        
+        results_scrollbar = ctk.CTkScrollbar(results_frame,
+                                             command=self.type_results_list.yview)
+        results_scrollbar.pack(side="right", fill="y", pady=6)
+        self.type_results_list.configure(yscrollcommand=results_scrollbar.set)
+        self.type_results_list.pack(side="left", fill="both", expand=True, padx=(8, 0), pady=6)
+        
+        self.update_type_results()
         
         # ---- Detail 输入框 ----
         detail_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
@@ -625,6 +1489,45 @@ class ProjectTemplateBuilder(ctk.CTk):
         )
         self.create_btn.pack(fill="x", pady=(25, 0))
     
+    def on_type_search(self, event):
+        """搜索框内容变化时更新结果（Shift、方向键等不改变内容的按键不会重置选择）"""
+        if self.type_search_entry.get() != self.last_type_query:
+            self.update_type_results()
+    
+    def update_type_results(self):
+        """根据搜索框内容刷新结果，并默认选中第一项"""
+        self.last_type_query = self.type_search_entry.get()
+        self.type_results = self.type_index.search(self.last_type_query)
+        self.type_results_list.delete(0, "end")
+        if self.type_results:
+            self.type_results_list.insert("end", *self.type_results)
+        self.select_type_result(0)
+    
+    def select_type_result(self, position):
+        """选中第 position 个搜索结果"""
+        self.type_results_list.selection_clear(0, "end")
+        if not self.type_results:
+            self.type_var.set("")
+            self.type_selection = 0
+            return
+        
+        self.type_selection = max(0, min(position, len(self.type_results) - 1))
+        self.type_results_list.selection_set(self.type_selection)
+        self.type_results_list.see(self.type_selection)
+        self.type_var.set(self.type_results[self.type_selection])
+    
+    def on_type_result_click(self, event):
+        """点击搜索结果"""
+        selection = self.type_results_list.curselection()
+        if selection:
+            self.select_type_result(selection[0])
+    
+    def move_type_selection(self, step):
+        """上下键切换选中的搜索结果"""
+        if self.type_results:
+            self.select_type_result(self.type_selection + step)
+        return "break"
+    
     def open_settings(self):
         """打开设置窗口"""
         TemplateManagerWindow(self, on_save_callback=self.on_config_saved)
@@ -632,10 +1535,8 @@ class ProjectTemplateBuilder(ctk.CTk):
     def on_config_saved(self):
         """配置保存后的回调"""
         self.reload_config()
-        # 更新下拉菜单
-        self.type_dropdown.configure(values=self.project_types)
-        if self.project_types:
-            self.type_var.set(self.project_types[0])
+        # 更新类型搜索结果
+        self.update_type_results()
         # 更新默认路径
         self.path_var.set(self.default_path)
     
@@ -648,14 +1549,6 @@ class ProjectTemplateBuilder(ctk.CTk):
         if folder:
             self.path_var.set(folder)
     
-    def create_folders_recursive(self, base_path, folder_dict):
-        """递归创建文件夹结构"""
-        for name, children in folder_dict.items():
-            folder_path = os.path.join(base_path, name)
-            os.makedirs(folder_path, exist_ok=True)
-            if children:
-                self.create_folders_recursive(folder_path, children)
-    
     def create_and_exit(self):
         """创建文件夹并退出程序"""
         
@@ -665,6 +1558,11 @@ class ProjectTemplateBuilder(ctk.CTk):
         base_path = self.path_var.get().strip()
         
         # 验证输入
+        if project_type not in self.subfolder_config:
+            messagebox.showwarning("⚠️ 提示", "请选择项目类型 (Type)！")
+            self.type_search_entry.focus()
+            return
+        
         if not detail:
             messagebox.showwarning("⚠️ 提示", "请输入项目详情 (Detail)！")
             self.detail_entry.focus()
@@ -684,13 +1582,31 @@ class ProjectTemplateBuilder(ctk.CTk):
             messagebox.showerror("❌ 错误", f"文件夹已存在：\n{folder_name}")
             return
         
+        subfolders = self.subfolder_config.get(project_type, {})
+        archive = self.template_archives.get(project_type)
+        archive_path = resolve_archive_path(archive) if archive else None
+        
         try:
+            # 模板归档（可选）：创建前先校验，避免留下半成品
+            if archive_path:
+                validate_archive(archive_path, subfolders)
+            
             # 创建父文件夹
             os.makedirs(full_path)
             
-            # 创建子文件夹（支持多级）
-            subfolders = self.subfolder_config.get(project_type, {})
-            self.create_folders_recursive(full_path, subfolders)
+            try:
+                # 创建子文件夹（支持多级）
+                create_folders_parallel(full_path, subfolders)
+                
+                # 逐条流式写入归档中的参考文件
+                if archive_path:
+                    materialize_archive(archive_path, full_path)
+            except Exception:
+                # 失败时删除本次创建的文件夹，方便直接重试
+                shutil.rmtree(full_path, ignore_errors=True)
+                raise
+            
+            record_type_usage(project_type)
             
             # 显示成功提示（0.5秒后自动关闭）
             self.show_success_and_exit(folder_name)
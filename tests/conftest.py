@@ -0,0 +1,36 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 导入 project_template_builder 时会执行 load_config()，缺少 config.json 时会写入默认配置；
+# 记录测试开始前的状态，结束后删除由测试生成的文件
+CONFIG_PATH = os.path.join(ROOT, "config.json")
+CONFIG_EXISTED = os.path.exists(CONFIG_PATH)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not CONFIG_EXISTED and os.path.exists(CONFIG_PATH):
+        os.remove(CONFIG_PATH)
+
+
+@pytest.fixture
+def app_dir(tmp_path, monkeypatch):
+    """将程序目录（config.json、日志、缓存、统计）指向临时目录"""
+    import project_template_builder as ptb
+    monkeypatch.setattr(ptb, "get_app_dir", lambda: str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def write_config(app_dir):
+    """返回写入测试用 config.json 的函数"""
+    def write(subfolder_config):
+        config = {"default_path": str(app_dir), "subfolder_config": subfolder_config}
+        with open(os.path.join(app_dir, "config.json"), "w", encoding="utf-8") as f:
+            json.dump(config, f)
+    return write
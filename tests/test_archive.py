@@ -0,0 +1,143 @@
+import io
+import json
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+pytest.importorskip("customtkinter")
+
+import project_template_builder as ptb  # noqa: E402
+
+
+def write_zip(path, entries):
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, data in entries:
+            zf.writestr(name, b"" if data is None else data)
+    return str(path)
+
+
+def write_tar(path, entries):
+    with tarfile.open(path, "w:gz") as tf:
+        for name, data in entries:
+            info = tarfile.TarInfo(name)
+            if data is None:
+                info.type = tarfile.DIRTYPE
+                tf.addfile(info)
+            else:
+                info.size = len(data)
+                tf.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+@pytest.mark.parametrize("name, parts", [
+    ("REF/readme.txt", ["REF", "readme.txt"]),
+    ("./REF//a.txt", ["REF", "a.txt"]),
+    ("REF\\sub\\a.txt", ["REF", "sub", "a.txt"]),
+    ("/etc/passwd", None),
+    ("\\Windows\\evil.txt", None),
+    ("../evil.txt", None),
+    ("REF/../../evil.txt", None),
+    ("REF\\..\\..\\evil.txt", None),
+    ("C:evil.txt", None),
+    ("C:/evil.txt", None),
+    ("ok/C:evil.txt", None),
+    ("ok\\D:\\evil.txt", None),
+    ("ok/file.txt:stream", None),
+    ("", None),
+    ("./", None),
+])
+def test_archive_member_parts(name, parts):
+    assert ptb.archive_member_parts(name) == parts
+
+
+def test_archive_member_path_stays_inside_target(tmp_path):
+    target = str(tmp_path / "project")
+
+    assert ptb.archive_member_path(target, "REF\\a.txt") == os.path.join(target, "REF", "a.txt")
+    assert ptb.archive_member_path(target, "ok/C:evil.txt") is None
+    assert ptb.archive_member_path(target, "a/../../evil.txt") is None
+
+
+def test_validate_rejects_unsafe_entries(tmp_path):
+    archive = write_zip(tmp_path / "bad.zip", [("REF/a.txt", "x"), ("ok/C:evil.txt", "x")])
+
+    with pytest.raises(ValueError):
+        ptb.validate_archive(archive)
+
+
+def test_validate_rejects_file_named_like_subfolder(tmp_path):
+    archive = write_zip(tmp_path / "clash.zip", [("OUTPUT/FINAL", "x")])
+
+    ptb.validate_archive(archive, {"REF": {}})
+    with pytest.raises(ValueError):
+        ptb.validate_archive(archive, {"OUTPUT": {"FINAL": {}}})
+
+
+@pytest.mark.parametrize("entries", [
+    [("REF", b"x"), ("REF/a.txt", b"y")],
+    [("REF/a.txt", b"y"), ("REF", b"x")],
+    [("REF/", None), ("REF", b"x")],
+    [("REF/sub/a.txt", b"y"), ("REF/sub", b"x")],
+])
+@pytest.mark.parametrize("writer", [write_zip, write_tar])
+def test_validate_rejects_file_named_like_archive_folder(tmp_path, writer, entries):
+    archive = writer(tmp_path / "clash", entries)
+
+    with pytest.raises(ValueError):
+        ptb.validate_archive(archive, cache_path=str(tmp_path / "cache.json"))
+
+
+@pytest.mark.parametrize("writer", [write_zip, write_tar])
+def test_materialize_streams_files_and_directories(tmp_path, writer):
+    entries = [("EMPTY/", None), ("REF/a.txt", b"hello"), ("REF/sub/b.txt", b"world")]
+    archive = writer(tmp_path / "template", entries)
+    target = tmp_path / "project"
+    target.mkdir()
+
+    ptb.validate_archive(archive, cache_path=str(tmp_path / "cache.json"))
+    count = ptb.materialize_archive(archive, str(target))
+
+    assert count == 2
+    assert (target / "EMPTY").is_dir()
+    assert (target / "REF" / "a.txt").read_bytes() == b"hello"
+    assert (target / "REF" / "sub" / "b.txt").read_bytes() == b"world"
+
+
+def test_materialize_checks_each_entry(tmp_path):
+    archive = write_tar(tmp_path / "bad.tar.gz", [("a.txt", b"x"), ("../evil.txt", b"x")])
+    target = tmp_path / "project"
+    target.mkdir()
+
+    with pytest.raises(ValueError):
+        ptb.materialize_archive(archive, str(target))
+    assert not (tmp_path / "evil.txt").exists()
+
+
+def test_tar_index_cache_is_reused_and_pruned(tmp_path):
+    cache_path = str(tmp_path / "cache.json")
+    old = write_tar(tmp_path / "old.tar.gz", [("a.txt", b"x")])
+    ptb.read_archive_index(old, cache_path)
+    os.remove(old)
+
+    archive = write_tar(tmp_path / "new.tar.gz", [("b.txt", b"y")])
+    assert ptb.read_archive_index(archive, cache_path) == [["b.txt", False]]
+
+    with open(cache_path, encoding="utf-8") as f:
+        cache = json.load(f)
+    assert list(cache) == [os.path.abspath(archive)]
+
+    # 命中缓存时不再扫描归档
+    cache[os.path.abspath(archive)]["entries"] = [["cached.txt", False]]
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f)
+    assert ptb.read_archive_index(archive, cache_path) == [["cached.txt", False]]
+
+
+def test_zip_index_does_not_use_cache(tmp_path):
+    cache_path = tmp_path / "cache.json"
+    archive = write_zip(tmp_path / "t.zip", [("a.txt", "x")])
+
+    assert ptb.read_archive_index(archive, str(cache_path)) == [["a.txt", False]]
+    assert not cache_path.exists()
@@ -0,0 +1,204 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("customtkinter")
+
+import project_template_builder as ptb  # noqa: E402
+
+
+def make_folders(root, *names):
+    for name in names:
+        os.makedirs(os.path.join(root, name))
+
+
+def test_index_matches_longest_type_first(tmp_path):
+    make_folders(tmp_path, "20240101_ART_a", "20240102_ART_3D_b", "notes", "2024_ART_x")
+
+    index = ptb.index_project_folders([str(tmp_path)], ["ART", "ART_3D"])
+
+    assert [os.path.basename(p) for p in index["ART"]] == ["20240101_ART_a"]
+    assert [os.path.basename(p) for p in index["ART_3D"]] == ["20240102_ART_3D_b"]
+
+
+def test_index_skips_files_and_missing_roots(tmp_path):
+    (tmp_path / "20240101_ART_file.txt").write_text("")
+
+    index = ptb.index_project_folders([str(tmp_path), str(tmp_path / "missing")], ["ART"])
+
+    assert index["ART"] == []
+
+
+def tag_folders(root):
+    """在每个文件夹里写入原名称，改名后用来核对身份"""
+    for name in os.listdir(root):
+        (root / name / "origin.txt").write_text(name)
+
+
+def origins(root):
+    return {name: (root / name / "origin.txt").read_text() for name in os.listdir(root)}
+
+
+def test_plan_skips_existing_targets(tmp_path):
+    make_folders(tmp_path, "20240101_ART_a", "20240103_ART_c", "20240103_PAINT_c",
+                 "20240104_ART_3D_d")
+
+    plan, conflicts = ptb.plan_bulk_rename([str(tmp_path)], {"ART": "PAINT"}, ["ART_3D"])
+
+    assert plan == [(str(tmp_path / "20240101_ART_a"), str(tmp_path / "20240101_PAINT_a"))]
+    assert conflicts == [(str(tmp_path / "20240103_ART_c"), str(tmp_path / "20240103_PAINT_c"))]
+
+
+def test_plan_skips_moves_into_folders_that_stay(tmp_path):
+    # PAINT_x 已存在且不在本批中，ART_x 被跳过，于是 CODE_x 也无法改为 ART_x；
+    # CODE_y -> ART_y 可以借助 ART_y 腾出的位置
+    make_folders(tmp_path, "20240101_ART_x", "20240101_PAINT_x", "20240101_CODE_x",
+                 "20240102_CODE_y", "20240102_ART_y")
+
+    plan, conflicts = ptb.plan_bulk_rename([str(tmp_path)], {"ART": "PAINT", "CODE": "ART"},
+                                           ["PAINT"])
+
+    assert sorted(plan) == sorted([
+        (str(tmp_path / "20240102_ART_y"), str(tmp_path / "20240102_PAINT_y")),
+        (str(tmp_path / "20240102_CODE_y"), str(tmp_path / "20240102_ART_y")),
+    ])
+    assert conflicts == [
+        (str(tmp_path / "20240101_ART_x"), str(tmp_path / "20240101_PAINT_x")),
+        (str(tmp_path / "20240101_CODE_x"), str(tmp_path / "20240101_ART_x")),
+    ]
+
+
+def test_swap_renames_through_temporary_names(app_dir):
+    root = app_dir / "projects"
+    make_folders(root, "20240101_A_x", "20240102_B_y", "20240103_A_z", "20240103_B_z")
+    tag_folders(root)
+
+    plan, conflicts = ptb.plan_bulk_rename([str(root)], {"A": "B", "B": "A"}, [])
+    done, failed = ptb.execute_bulk_rename(plan, {"A": "B", "B": "A"})
+
+    assert not conflicts and not failed and len(done) == 4
+    assert origins(root) == {
+        "20240101_B_x": "20240101_A_x",
+        "20240102_A_y": "20240102_B_y",
+        "20240103_B_z": "20240103_A_z",
+        "20240103_A_z": "20240103_B_z",
+    }
+
+
+def test_cycle_renames_and_undo_whole_batch(app_dir, write_config):
+    root = app_dir / "projects"
+    make_folders(root, "20240101_A_x", "20240101_B_x", "20240101_C_x", "20240102_D_y")
+    tag_folders(root)
+    before = origins(root)
+    write_config({"B": {}, "C": {}, "A": {}, "E": {}})
+    # 保存时使用统计已随类型改名
+    ptb.save_usage_stats({"B": 3, "C": 2, "E": 1})
+    renames = {"A": "B", "B": "C", "C": "A", "D": "E"}
+
+    plan, _ = ptb.plan_bulk_rename([str(root)], renames, [])
+    done, failed = ptb.execute_bulk_rename(plan, renames)
+    assert len(done) == 4 and not failed
+    assert origins(root)["20240101_B_x"] == "20240101_A_x"
+    assert origins(root)["20240102_E_y"] == "20240102_D_y"
+
+    done, failed = ptb.undo_bulk_rename()
+
+    assert len(done) == 4 and not failed
+    assert origins(root) == before
+    assert list(ptb.load_config()["subfolder_config"]) == ["A", "B", "C", "D"]
+    assert ptb.load_usage_stats() == {"A": 3, "B": 2, "D": 1}
+    assert not os.path.exists(ptb.get_journal_path())
+
+
+def test_undo_restores_config_and_usage(app_dir, write_config):
+    root = app_dir / "projects"
+    make_folders(root, "20240101_ART_a", "20240102_ART_b")
+    write_config({"PAINT": {"REF": {}}, "CODE": {}})
+    ptb.save_usage_stats({"PAINT": 3})
+
+    plan, _ = ptb.plan_bulk_rename([str(root)], {"ART": "PAINT"}, ["CODE"])
+    ptb.execute_bulk_rename(plan, {"ART": "PAINT"})
+    done, failed = ptb.undo_bulk_rename()
+
+    assert len(done) == 2 and not failed
+    assert sorted(os.listdir(root)) == ["20240101_ART_a", "20240102_ART_b"]
+    assert list(ptb.load_config()["subfolder_config"]) == ["ART", "CODE"]
+    assert ptb.load_usage_stats() == {"ART": 3}
+
+
+def test_undo_keeps_usage_when_config_rename_is_refused(app_dir, write_config):
+    root = app_dir / "projects"
+    make_folders(root, "20240101_ART_a")
+    # 保存后类型又被改名为 OTHER，配置中已没有 PAINT
+    write_config({"OTHER": {}, "ART": {}})
+    ptb.save_usage_stats({"PAINT": 3})
+    plan, _ = ptb.plan_bulk_rename([str(root)], {"ART": "PAINT"}, [])
+    ptb.execute_bulk_rename(plan, {"ART": "PAINT"})
+
+    done, failed = ptb.undo_bulk_rename()
+
+    assert len(done) == 1 and not failed
+    assert list(ptb.load_config()["subfolder_config"]) == ["OTHER", "ART"]
+    assert ptb.load_usage_stats() == {"PAINT": 3}
+
+
+def test_undo_partially_applied_direct_journal(app_dir, write_config):
+    root = app_dir / "projects"
+    # 模拟中途中断：日志包含完整计划，但只有第一项实际改名
+    make_folders(root, "20240101_PAINT_a", "20240102_ART_b")
+    write_config({"PAINT": {}})
+    steps = [(str(root / "20240101_ART_a"), str(root / "20240101_PAINT_a"), None),
+             (str(root / "20240102_ART_b"), str(root / "20240102_PAINT_b"), None)]
+    ptb.save_rename_journal({"ART": "PAINT"}, steps, "moving")
+
+    done, failed = ptb.undo_bulk_rename()
+
+    assert done == [(str(root / "20240101_PAINT_a"), str(root / "20240101_ART_a"))]
+    assert not failed
+    assert sorted(os.listdir(root)) == ["20240101_ART_a", "20240102_ART_b"]
+
+
+def test_undo_swap_interrupted_during_first_phase(app_dir, write_config):
+    root = app_dir / "projects"
+    a, b = root / "20240101_A_x", root / "20240101_B_x"
+    make_folders(root, "20240101_A_x", "20240101_B_x")
+    tag_folders(root)
+    write_config({"B": {}, "A": {}})
+    steps = ptb.resolve_rename_order([(str(a), str(b)), (str(b), str(a))])
+    ptb.save_rename_journal({"A": "B", "B": "A"}, steps, "moving")
+    # 只有 A_x 移到了临时名称，B_x 仍在原位
+    os.rename(a, steps[0][2])
+
+    done, failed = ptb.undo_bulk_rename()
+
+    assert not failed and len(done) == 1
+    assert origins(root) == {"20240101_A_x": "20240101_A_x", "20240101_B_x": "20240101_B_x"}
+
+
+def test_undo_without_journal_does_nothing(app_dir):
+    assert ptb.undo_bulk_rename() == ([], [])
+
+
+def test_rename_config_types_keeps_order_and_archives():
+    config = {"subfolder_config": {"ART": {"REF": {}}, "CODE": {}, "DOC": {}},
+              "template_archives": {"ART": "art.zip"}}
+
+    assert ptb.rename_config_types(config, {"ART": "PAINT"})
+    assert list(config["subfolder_config"]) == ["PAINT", "CODE", "DOC"]
+    assert config["template_archives"] == {"PAINT": "art.zip"}
+    assert ptb.rename_config_types(config, {"CODE": "DOC", "DOC": "CODE"})
+    assert list(config["subfolder_config"]) == ["PAINT", "DOC", "CODE"]
+    assert not ptb.rename_config_types(config, {"PAINT": "CODE"})
+    assert not ptb.rename_config_types(config, {"MISSING": "X"})
+
+
+def test_rename_types_usage_merges_and_swaps_counts(app_dir):
+    ptb.save_usage_stats({"ART": 2, "PAINT": 1, "CODE": 5})
+
+    ptb.rename_types_usage({"ART": "PAINT"})
+    assert ptb.load_usage_stats() == {"PAINT": 3, "CODE": 5}
+
+    ptb.rename_types_usage({"PAINT": "CODE", "CODE": "PAINT"})
+    with open(ptb.get_usage_stats_path(), encoding="utf-8") as f:
+        assert json.load(f) == {"CODE": 3, "PAINT": 5}
@@ -0,0 +1,155 @@
+import errno
+import os
+import random
+
+import pytest
+
+pytest.importorskip("customtkinter")
+
+import project_template_builder as ptb  # noqa: E402
+
+
+class FlakyFileSystem(ptb.LocalFileSystem):
+    """前 failures_per_path 次创建某个文件夹时抛出 error_number 错误"""
+
+    def __init__(self, failures_per_path, error_number=errno.EIO):
+        self.failures_per_path = failures_per_path
+        self.error_number = error_number
+        self.attempts = {}
+
+    def makedirs(self, path):
+        self.attempts[path] = self.attempts.get(path, 0) + 1
+        if self.attempts[path] <= self.failures_per_path:
+            raise OSError(self.error_number, os.strerror(self.error_number), path)
+        super().makedirs(path)
+
+
+def test_controller_grows_while_latency_is_flat():
+    controller = ptb.AdaptiveConcurrency(initial=2, max_workers=4, window=4)
+
+    for _ in range(4 * 5):
+        controller.record(0.01)
+
+    assert controller.workers == 4
+
+
+def test_controller_halves_when_latency_rises():
+    controller = ptb.AdaptiveConcurrency(initial=8, window=4)
+    for _ in range(4):
+        controller.record(0.01)
+    assert controller.workers == 9
+
+    for _ in range(4):
+        controller.record(0.05)
+
+    assert controller.workers == 4
+
+
+def test_controller_does_not_collapse_on_noisy_flat_latency():
+    rng = random.Random(0)
+    controller = ptb.AdaptiveConcurrency(initial=4, max_workers=32)
+
+    # 一次特别快的调用之后是 8-12 ms 的平稳延迟
+    controller.record(0.002)
+    for _ in range(200):
+        controller.record(rng.uniform(0.008, 0.012))
+
+    assert controller.workers > 4
+
+
+def test_controller_baseline_recovers_from_a_fast_window():
+    controller = ptb.AdaptiveConcurrency(initial=8, window=4)
+    for _ in range(4):
+        controller.record(0.001)
+    for _ in range(4 * 30):
+        controller.record(0.01)
+
+    assert controller.baseline > 0.009
+    assert controller.workers > 8
+
+
+def test_controller_ignores_sub_millisecond_local_latency():
+    rng = random.Random(0)
+    controller = ptb.AdaptiveConcurrency(initial=4, max_workers=16)
+
+    # 本地磁盘：微秒级延迟，相对波动很大
+    for _ in range(200):
+        controller.record(rng.choice([0.00002, 0.00003, 0.0002, 0.0008]))
+
+    assert controller.workers == 16
+
+
+def test_controller_halves_on_failure_and_respects_minimum():
+    controller = ptb.AdaptiveConcurrency(initial=3, min_workers=2, window=4)
+    controller.record(0.01)
+
+    controller.record_failure()
+    assert controller.workers == 2
+    controller.record_failure()
+    assert controller.workers == 2
+
+    # 失败后重新收集样本窗口
+    for _ in range(3):
+        controller.record(0.01)
+    assert controller.workers == 2
+    controller.record(0.01)
+    assert controller.workers == 3
+
+
+def test_parallel_creates_full_tree(tmp_path):
+    folders = {"A": {"A1": {"A1x": {}}, "A2": {}}, "B": {}}
+
+    created = ptb.create_folders_parallel(str(tmp_path), folders)
+
+    assert created == 5
+    for path in ("A/A1/A1x", "A/A2", "B"):
+        assert (tmp_path / path).is_dir()
+
+
+def test_parallel_retries_transient_failures(tmp_path):
+    fs = FlakyFileSystem(failures_per_path=2)
+    controller = ptb.AdaptiveConcurrency(initial=4)
+
+    created = ptb.create_folders_parallel(str(tmp_path), {"A": {"A1": {}}, "B": {}},
+                                          fs, controller, max_retries=2)
+
+    assert created == 3
+    assert set(fs.attempts.values()) == {3}
+    assert controller.workers == 1
+
+
+def test_parallel_raises_when_retries_run_out(tmp_path):
+    fs = FlakyFileSystem(failures_per_path=3)
+
+    with pytest.raises(OSError):
+        ptb.create_folders_parallel(str(tmp_path), {"A": {"A1": {}}}, fs, max_retries=2)
+    assert not os.path.exists(tmp_path / "A" / "A1")
+
+
+def test_parallel_raises_permanent_errors_without_retrying(tmp_path):
+    fs = FlakyFileSystem(failures_per_path=1, error_number=errno.EACCES)
+    controller = ptb.AdaptiveConcurrency(initial=4)
+
+    with pytest.raises(PermissionError):
+        ptb.create_folders_parallel(str(tmp_path), {"A": {}}, fs, controller)
+    assert fs.attempts == {str(tmp_path / "A"): 1}
+    assert controller.workers == 4
+
+
+def test_parallel_keeps_concurrency_with_jittery_simulated_latency(tmp_path):
+    fs = ptb.SimulatedSlowFileSystem(latency=0.002, jitter=0.3, seed=0)
+    controller = ptb.AdaptiveConcurrency(initial=4)
+    folders = {f"D{i}": {f"S{j}": {} for j in range(9)} for i in range(12)}
+
+    assert ptb.create_folders_parallel(str(tmp_path), folders, fs, controller) == 120
+    assert controller.workers > 4
+
+
+def test_simulated_filesystem_counts_injected_failures(tmp_path):
+    fs = ptb.SimulatedSlowFileSystem(latency=0, failure_rate=1.0, seed=0)
+
+    with pytest.raises(OSError):
+        fs.makedirs(str(tmp_path / "A"))
+
+    assert (fs.calls, fs.failures) == (1, 1)
+    assert not (tmp_path / "A").exists()
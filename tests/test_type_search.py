@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("customtkinter")
+
+import project_template_builder as ptb  # noqa: E402
+
+SUBFOLDER_CONFIG = {
+    "ART": {"REF": {}, "BLENDER": {"TEXTURES": {}}},
+    "ART_3D_CHARACTER": {"ZBRUSH": {}},
+    "CODE": {"SRC": {}},
+    "CARDS": {},
+}
+
+
+def test_ranks_exact_prefix_substring_subsequence_then_subfolders():
+    index = ptb.TypeSearchIndex({"XARTX": {}, "ART_3D": {}, "ART": {}, "AXRXT": {},
+                                 "CODE": {"ART_REF": {}}})
+
+    assert index.search("art") == ["ART", "ART_3D", "XARTX", "AXRXT", "CODE"]
+
+
+def test_usage_orders_within_rank_and_empty_query_lists_everything():
+    index = ptb.TypeSearchIndex(SUBFOLDER_CONFIG, {"CODE": 2.5, "CARDS": 1})
+
+    assert index.search("") == ["CODE", "CARDS", "ART", "ART_3D_CHARACTER"]
+    assert index.search("c") == ["CODE", "CARDS", "ART_3D_CHARACTER"]
+    assert index.search("", limit=2) == ["CODE", "CARDS"]
+
+
+def test_subfolder_matching_is_optional():
+    assert ptb.TypeSearchIndex(SUBFOLDER_CONFIG).search("textures") == ["ART"]
+    index = ptb.TypeSearchIndex(SUBFOLDER_CONFIG, include_subfolders=False)
+    assert index.search("textures") == []
+
+
+def test_record_type_usage_decays_older_counts(app_dir):
+    ptb.record_type_usage("ART")
+    ptb.record_type_usage("CODE")
+
+    assert ptb.load_usage_stats() == {"ART": 0.95, "CODE": 1}